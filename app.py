@@ -1,8 +1,17 @@
 import streamlit as st
-import streamlit.components.v1 as components
-import time
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
-import math
+import json
+import time
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: without it the kernel runs as plain Python.
+    def njit(func):
+        return func
 
 # -----------------------
 # PAGE CONFIGURATION
@@ -11,22 +20,34 @@ st.set_page_config(page_title="ATOA Simulation", layout="wide")
 st.title("🚨 AI-Based Advanced Traffic Optimizer & Assistant (ATOA)")
 st.subheader("Scripted Demo: Blackspot Accident Prevention")
 
-# -----------------------
-# SIDEBAR CONTROLS
-# -----------------------
-st.sidebar.header("Simulation Controls")
-fog_level = st.sidebar.slider("Fog Level (Reduces Visibility)", 0, 90, 80, help="High fog = low visibility. Drivers can't see far.")
-run_button = st.sidebar.button("▶ Start Simulation")
-reset_button = st.sidebar.button("■ Reset Simulation")
-
 # -----------------------
 # SIMULATION CONSTANTS
 # -----------------------
 ROAD_LENGTH = 100
 NORMAL_SPEED = 1      # Cars move slowly
 BRAKING_SPEED = 0.5   # Cars brake even slower
-VISIBILITY_DISTANCE = 50 * (1 - fog_level / 100.0)
-BRAKING_DISTANCE = 15 
+BRAKING_DISTANCE = 15
+
+# Positions and speeds are stored in integer half-metre units (0.5 m is the
+# finest speed step), so the tick kernel runs entirely on integers. Divide
+# by SCALE only when drawing.
+SCALE = 2
+ROAD_END = ROAD_LENGTH * SCALE
+NORMAL_SPEED_H = int(NORMAL_SPEED * SCALE)
+BRAKING_SPEED_H = int(BRAKING_SPEED * SCALE)
+
+# Fog-derived parameters. Built once per fog level (cached) and frozen into
+# session state while a simulation is running; attribute reads are C-level
+# slot lookups rather than global name lookups.
+@dataclass(frozen=True, slots=True)
+class SimParams:
+    fog_level: int
+    visibility: float
+
+@st.cache_data
+def get_sim_params(fog_level):
+    """Derives the visibility constants for a given fog level."""
+    return SimParams(fog_level, 50 * (1 - fog_level / 100.0))
 
 # --- SCRIPTED EVENTS ---
 CAR_2_START_TIME = 20  # Car 2 starts when sim time = 20
@@ -35,266 +56,396 @@ CAR_4_START_TIME = 50  # Car 4 starts when sim time = 50
 BLACKSPOT_B = 70       # Position of the blackspot
 CRASH_TIME = 70        # Car 2 will crash when sim time = 70
 
+# --- CAR STATUS CODES ---
+# Small ints so the status array stays int8 and hot-path checks are integer
+# compares instead of string prefix scans. Terminal states sort >= STOPPED.
+WAITING, NORMAL, BRAKING_ALERT, STOPPED, CRASHED, FINISHED = range(6)
+STATUS_LABEL = ('Waiting', 'Normal', 'Braking (Alert)', 'Stopped', 'Crashed', 'Finished')
+# Road byte per status code; the zero slots fall back to the car's id digit.
+# The road is built as an ASCII bytearray and the placeholder bytes are
+# stitched into emoji with one str.translate pass at the end.
+STATUS_BYTE = (0, 0, 0, ord('S'), ord('X'), 0)
+EMOJI_TABLE = str.maketrans({'X': '💥', 'S': '🛑'})
+# Colour cue per status for the car table.
+STATUS_DOT = ('⚪', '🟢', '🟡', '🛑', '💥', '🏁')
+
+# Event bits returned by the tick kernel; logging/voice happens outside
+# the jitted code so the kernel stays nopython-safe.
+EV_ALERTED, EV_STOPPED, EV_FINISHED = 1, 2, 4
+
+# --- CAR LAYOUT ---
+# Car state lives in parallel arrays; slot i belongs to CAR_IDS[i].
+CAR_IDS = ('1', '2', '3', '4')
+NUM_CARS = len(CAR_IDS)
+CAR_START_TIMES = (1, CAR_2_START_TIME, CAR_3_START_TIME, CAR_4_START_TIME)
+# Car i follows CAR_FRONT[i] (-1 = nobody ahead, masked out below).
+CAR_FRONT = np.array([-1, 0, 1, 2])
+CAR_ID_BYTES = tuple(ord(c) for c in CAR_IDS)
+
 # -----------------------
 # HELPER FUNCTIONS
 # -----------------------
 
-def get_time():
-    """Helper to get a simple timestamp for the log."""
-    return datetime.now().strftime("%H:%M:%S")
+# strftime is surprisingly heavy; entries within the same wall-clock second
+# share one formatted string.
+_time_cache = (0, '')
 
-def add_log_entry(log, message, voice_queue=None, speak=False):
-    """Adds to log (for voice logic) but log is not displayed."""
-    entry = f"[{get_time()}] {message}"
-    if not log or log[0] != entry:
-        log.insert(0, entry)
-        if speak and voice_queue is not None:
-            voice_queue.append(message)
+def get_time():
+    """Helper to get a simple timestamp for the log, cached per second."""
+    global _time_cache
+    t = int(time.time())
+    if t != _time_cache[0]:
+        _time_cache = (t, datetime.now().strftime("%H:%M:%S"))
+    return _time_cache[1]
+
+# streamlit.components.v1 is only needed when a voice alert actually fires,
+# so it is imported lazily instead of on every script load.
+_components = None
+
+def _get_components():
+    global _components
+    if _components is None:
+        import streamlit.components.v1 as _components
+    return _components
+
+# Last raw message appended per log, for O(1) dedup (the timestamped
+# entries would stop matching as soon as the clock ticks over).
+_last_message = {}
+
+def new_alert_log(*entries):
+    """Creates a fresh bounded log, clearing any dedup state left behind by
+    a freed log that happened to live at the same address."""
+    log = deque(entries, maxlen=200)
+    _last_message[id(log)] = None
+    return log
+
+def add_log_entry(log, fmt, *args, voice_queue=None, speak=False):
+    """Adds to log (for voice logic) but log is not displayed. Messages are
+    passed logging-style as (fmt, args); both the %-formatting and the
+    timestamp are only produced once the dedup check has passed."""
+    key = (fmt, args)
+    if _last_message.get(id(log)) == key:
+        return
+    _last_message[id(log)] = key
+    message = fmt % args if args else fmt
+    log.appendleft(f"[{get_time()}] {message}")
+    if speak and voice_queue is not None:
+        voice_queue.append(message)
 
 def initialize_cars():
-    """Creates a list of car dictionaries."""
+    """Creates the car state as parallel arrays (structure-of-arrays)."""
     cars = {
-        '1': {'id': '1', 'x': -10, 'speed': 0, 'status': 'Waiting', 'alert_message': ''},
-        '2': {'id': '2', 'x': -10, 'speed': 0, 'status': 'Waiting', 'alert_message': ''},
-        '3': {'id': '3', 'x': -10, 'speed': 0, 'status': 'Waiting', 'alert_message': ''},
-        '4': {'id': '4', 'x': -10, 'speed': 0, 'status': 'Waiting', 'alert_message': ''}
+        'x': np.full(NUM_CARS, -10 * SCALE, dtype=np.int64),
+        'speed': np.zeros(NUM_CARS, dtype=np.int64),
+        'status': np.full(NUM_CARS, WAITING, dtype=np.int8),
+        'alert_message': [''] * NUM_CARS,
     }
     return cars
 
-def update_simulation_logic(cars, sim_time, accident_info, log, voice_queue):
-    """Updates the logic for ALL cars based on the scripted time."""
-    
-    # --- 1. SCRIPTED CAR STARTS ---
-    if sim_time == 1:
-        cars['1']['status'] = 'Normal'
-        cars['1']['speed'] = NORMAL_SPEED
-        add_log_entry(log, "Car 1 is on the road.", voice_queue, speak=True)
-    if sim_time == CAR_2_START_TIME:
-        cars['2']['status'] = 'Normal'
-        cars['2']['speed'] = NORMAL_SPEED
-        add_log_entry(log, "Car 2 is on the road.", voice_queue, speak=True)
-    if sim_time == CAR_3_START_TIME:
-        cars['3']['status'] = 'Normal'
-        cars['3']['speed'] = NORMAL_SPEED
-        add_log_entry(log, "Car 3 is on the road.")
-    if sim_time == CAR_4_START_TIME:
-        cars['4']['status'] = 'Normal'
-        cars['4']['speed'] = NORMAL_SPEED
-        add_log_entry(log, "Car 4 is on the road.")
-
-    # --- 2. SCRIPTED CRASH ---
-    if not accident_info and sim_time >= CRASH_TIME and cars['2']['x'] >= BLACKSPOT_B:
-        cars['2']['status'] = 'Crashed'
-        cars['2']['speed'] = 0
-        cars['2']['x'] = BLACKSPOT_B # Pin to exact spot
-        accident_info = {'id': '2', 'x': BLACKSPOT_B}
-        add_log_entry(log, "CRITICAL: Car 2 has crashed at Blackspot B! Broadcasting ATOA alert!", voice_queue, speak=True)
-    
-    # --- 3. UPDATE EACH CAR'S LOGIC ---
-    for car_id in ['1', '2', '3', '4']:
-        car = cars[car_id]
-        if car['status'] == 'Waiting' or car['status'] == 'Finished' or car['status'] == 'Crashed':
+# Note: no cache=True here — loading a cached kernel makes numba re-import
+# the defining module, which re-executes this Streamlit script mid-tick.
+@njit
+def _step_cars(x, speed, status, has_accident, accident_x):
+    """Numeric core of one tick: ATOA braking, follow logic, movement and
+    finish handling. Mutates the arrays in place and returns per-car event
+    bits (EV_*) for the Python-side logging."""
+    events = np.zeros(x.shape[0], np.int8)
+    # Loop-invariant thresholds, hoisted so the per-car body does plain
+    # compares (CPython won't CSE these in the no-numba fallback).
+    stop_at = accident_x - (BRAKING_DISTANCE + 5) * SCALE
+    follow_threshold = (BRAKING_DISTANCE + 10) * SCALE
+    for i in range(x.shape[0]):
+        s = status[i]
+        if s != NORMAL and s != BRAKING_ALERT:
             continue # Don't move
-            
-        old_status = car['status']
 
         # --- ATOA LOGIC ---
-        if accident_info and car['status'] == 'Normal' and car['id'] not in ['1', '2']:
-            car['status'] = 'Braking (Alert)'
-            car['alert_message'] = "🚨 ATOA Alert!"
-            add_log_entry(log, f"Car {car_id}: Received broadcast! Accident ahead. Braking.", voice_queue, speak=True)
-
-        # --- FIND CAR IN FRONT ---
-        car_in_front = None
-        if car_id == '2': car_in_front = cars['1']
-        if car_id == '3': car_in_front = cars['2']
-        if car_id == '4': car_in_front = cars['3']
-
-        distance = 999
-        if car_in_front and car_in_front['x'] > car['x']:
-            distance = car_in_front['x'] - car['x']
+        if has_accident and s == NORMAL and i >= 2:
+            s = BRAKING_ALERT
+            events[i] |= EV_ALERTED
 
         # --- VISUAL & SPEED LOGIC ---
-        if car['status'].startswith('Braking'):
-            car['speed'] = BRAKING_SPEED
+        if s == BRAKING_ALERT:
+            speed[i] = BRAKING_SPEED_H
             # Check if we are at the crash site
-            if accident_info and car['x'] >= (accident_info['x'] - BRAKING_DISTANCE - 5):
-                car['status'] = 'Stopped'
-                car['alert_message'] = "Stopped Safely."
-        
-        elif car['status'] == 'Normal':
-            car['speed'] = NORMAL_SPEED
+            if has_accident and x[i] >= stop_at:
+                s = STOPPED
+                events[i] |= EV_STOPPED
+        else:
+            speed[i] = NORMAL_SPEED_H
             # Simple follow logic
-            if distance < (BRAKING_DISTANCE + 10):
-                car['speed'] = BRAKING_SPEED
+            f = CAR_FRONT[i]
+            if f >= 0 and x[f] > x[i] and x[f] - x[i] < follow_threshold:
+                speed[i] = BRAKING_SPEED_H
 
-        # Log status changes
-        if car['status'] != old_status and car['status'] == 'Stopped':
-            add_log_entry(log, f"Car {car_id}: Stopped safely behind the accident.")
+        status[i] = s
 
         # --- Move the car ---
-        if car['status'] != 'Stopped':
-            car['x'] += car['speed']
+        if s != STOPPED:
+            x[i] += speed[i]
+
+            # --- Check if finished ---
+            if x[i] >= ROAD_END:
+                status[i] = FINISHED
+                x[i] = ROAD_END
+                speed[i] = 0
+                events[i] |= EV_FINISHED
+    return events
 
-        # --- Check if finished ---
-        if car['x'] >= ROAD_LENGTH:
-            car['status'] = 'Finished'
-            car['x'] = ROAD_LENGTH
-            car['speed'] = 0
-            if car_id == '1':
-                add_log_entry(log, "Car 1 finished safely.")
+def update_simulation_logic(cars, sim_time, accident_info, log, voice_queue):
+    """Updates the logic for ALL cars based on the scripted time."""
+    x = cars['x']
+    speed = cars['speed']
+    status = cars['status']
+
+    # --- 1. SCRIPTED CAR STARTS ---
+    for i in range(NUM_CARS):
+        if sim_time == CAR_START_TIMES[i]:
+            status[i] = NORMAL
+            speed[i] = NORMAL_SPEED_H
+            # Only the first two starts are voiced.
+            add_log_entry(log, "Car %s is on the road.", CAR_IDS[i], voice_queue=voice_queue, speak=(i < 2))
+
+    # --- 2. SCRIPTED CRASH ---
+    if not accident_info and sim_time >= CRASH_TIME and x[1] >= BLACKSPOT_B * SCALE:
+        status[1] = CRASHED
+        speed[1] = 0
+        x[1] = BLACKSPOT_B * SCALE # Pin to exact spot
+        accident_info = {'id': '2', 'x': BLACKSPOT_B}
+        add_log_entry(log, "CRITICAL: Car 2 has crashed at Blackspot B! Broadcasting ATOA alert!", voice_queue=voice_queue, speak=True)
+
+    # --- 3. RUN THE NUMERIC KERNEL ---
+    has_accident = accident_info is not None
+    accident_x = accident_info['x'] * SCALE if has_accident else -1
+    events = _step_cars(x, speed, status, has_accident, accident_x)
+
+    # --- 4. TRANSLATE KERNEL EVENTS INTO LOG/VOICE ENTRIES ---
+    for i in range(NUM_CARS):
+        if events[i] & EV_ALERTED:
+            cars['alert_message'][i] = "🚨 ATOA Alert!"
+            add_log_entry(log, "Car %s: Received broadcast! Accident ahead. Braking.", CAR_IDS[i], voice_queue=voice_queue, speak=True)
+        if events[i] & EV_STOPPED:
+            cars['alert_message'][i] = "Stopped Safely."
+            add_log_entry(log, "Car %s: Stopped safely behind the accident.", CAR_IDS[i])
+        if events[i] & EV_FINISHED and i == 0:
+            add_log_entry(log, "Car 1 finished safely.")
 
     return accident_info
 
 
-def render_full_road(cars):
+# Road templates with the static markers baked in, built once per visibility
+# level and copied per render (the fog marker only moves with the slider).
+_road_templates = {}
+
+def _road_template(visibility):
+    """Returns the empty road bytes with A/G/B and the fog marker pre-placed."""
+    tpl = _road_templates.get(visibility)
+    if tpl is None:
+        buf = bytearray(b"-" * (ROAD_LENGTH + 1))
+        buf[0] = ord("A") # Start Point
+        buf[ROAD_LENGTH] = ord("G") # End Point
+        buf[BLACKSPOT_B] = ord("B") # Blackspot marker
+
+        # Place a fog marker to show what drivers can see
+        fog_marker_pos = int(BLACKSPOT_B - visibility)
+        if 0 < fog_marker_pos < ROAD_LENGTH and buf[fog_marker_pos] == ord("-"):
+            buf[fog_marker_pos] = ord("|") # "|" = Fog visibility limit
+        tpl = bytes(buf)
+        _road_templates[visibility] = tpl
+    return tpl
+
+def render_full_road(cars, visibility):
     """
     Renders the full road with all cars, like the obj2 simulation.
     """
-    road = ["-"] * (ROAD_LENGTH + 1) # Create the road
-    road[0] = "A" # Start Point
-    road[ROAD_LENGTH] = "G" # End Point
-    
-    # Place a marker for the blackspot
-    road[BLACKSPOT_B] = "B" 
-    
-    # Place a fog marker to show what drivers can see
-    fog_marker_pos = int(BLACKSPOT_B - VISIBILITY_DISTANCE)
-    if 0 < fog_marker_pos < ROAD_LENGTH and road[fog_marker_pos] == "-":
-        road[fog_marker_pos] = "|" # "|" = Fog visibility limit
-    
-    # Place cars on the road
-    for car_id in ['4', '3', '2', '1']: # Draw in reverse order
-        car = cars[car_id]
-        pos = int(math.floor(car['x']))
-
-        if 0 <= pos <= ROAD_LENGTH:
-            symbol = car_id # Default
-            if car['status'] == 'Crashed': symbol = "💥"
-            elif car['status'] == 'Stopped': symbol = "🛑"
-            elif car['status'] == 'Braking (Alert)': symbol = car_id.lower() # "3", "4"
-            
-            # Don't overwrite Start, End, or Blackspot
-            if road[pos] in ["-", "|"]:
-                road[pos] = symbol
-            elif car['status'] == 'Crashed': # Crash overrides Blackspot
-                road[pos] = "💥"
-            
-    return "".join(road)
+    road = bytearray(_road_template(visibility)) # one memcpy
+
+    # Place cars on the road: positions come from one vectorized pass, the
+    # placement loop only touches the handful of on-road cars. The display
+    # cell is 1:1 with road metres, so mapping is just the half-unit divide.
+    pos = cars['x'] // SCALE
+    on_road = (pos >= 0) & (pos <= ROAD_LENGTH)
+    dash, pipe = ord("-"), ord("|")
+    for i in reversed(range(NUM_CARS)): # Draw in reverse order
+        if not on_road[i]:
+            continue
+        car_status = cars['status'][i]
+        symbol = STATUS_BYTE[car_status] or CAR_ID_BYTES[i]
+
+        cell = road[pos[i]]
+        # Don't overwrite Start, End, or Blackspot
+        if cell == dash or cell == pipe:
+            road[pos[i]] = symbol
+        elif car_status == CRASHED: # Crash overrides Blackspot
+            road[pos[i]] = ord("X")
+
+    return road.decode("ascii").translate(EMOJI_TABLE)
 
 def speak_alerts(voice_queue):
-    """Generates JS to speak all queued alerts."""
+    """Generates a JS snippet that speaks the queued alerts as one utterance."""
     if not voice_queue:
         return ""
-    script = "<script>"
-    for alert_text in voice_queue:
-        alert_text = alert_text.replace("'", "").replace('"', "")
-        script += f"var msg = new SpeechSynthesisUtterance('{alert_text}'); window.speechSynthesis.speak(msg);"
-    script += "</script>"
-    return script
+    # Order-preserving dedup, then one utterance for the whole tick; the
+    # cancel() drops stale speech still queued from earlier ticks so alerts
+    # never pile up behind each other. json.dumps escapes quotes/backslashes
+    # properly (the old per-message replace() calls just deleted them).
+    text = ". ".join(dict.fromkeys(voice_queue))
+    return f"<script>window.speechSynthesis.cancel(); window.speechSynthesis.speak(new SpeechSynthesisUtterance({json.dumps(text)}));</script>"
+
+def reset_simulation(running=False):
+    """Puts the session back to a fresh simulation state. The same reset
+    serves first load, the Start button (running=True) and Reset."""
+    st.session_state.simulation_running = running
+    st.session_state.sim_time = 0
+    st.session_state.cars = initialize_cars()
+    st.session_state.accident_info = None
+    if running:
+        st.session_state.alert_log = new_alert_log(f"[{get_time()}] Simulation Started.")
+    else:
+        st.session_state.alert_log = new_alert_log()
+    st.session_state.demo_finished = False
 
 # -----------------------
 # INITIALIZE SESSION STATE
 # -----------------------
 if 'simulation_running' not in st.session_state:
-    st.session_state.simulation_running = False
-    st.session_state.sim_time = 0
-    st.session_state.cars = initialize_cars()
-    st.session_state.accident_info = None
-    st.session_state.alert_log = []
+    reset_simulation()
+
+# -----------------------
+# SIDEBAR CONTROLS
+# -----------------------
+st.sidebar.header("Simulation Controls")
+if not st.session_state.simulation_running:
+    # The sliders only matter before a run starts; hiding them while the
+    # simulation runs keeps widget re-rendering out of the tick path.
+    fog_level = st.sidebar.slider("Fog Level (Reduces Visibility)", 0, 90, 80, help="High fog = low visibility. Drivers can't see far.")
+    st.session_state.params = get_sim_params(fog_level)
+    # Batching several logic steps per frame amortizes the fixed per-frame
+    # Streamlit cost; the fragment interval is scaled to match, so the
+    # wall-clock pace of the demo stays the same.
+    st.session_state.ticks_per_frame = st.sidebar.slider("Ticks per frame", 1, 10, 1, help="Simulation steps computed per rendered frame.")
+run_button = st.sidebar.button("▶ Start Simulation")
+reset_button = st.sidebar.button("■ Reset Simulation")
 
 if run_button:
-    st.session_state.simulation_running = True
-    st.session_state.sim_time = 0
-    st.session_state.cars = initialize_cars()
-    st.session_state.accident_info = None
-    st.session_state.alert_log = [f"[{get_time()}] Simulation Started."]
-    st.rerun() # Start the loop
+    reset_simulation(running=True)
+    st.rerun() # Re-run once so the tick fragment picks up its timer
 
 if reset_button:
-    st.session_state.simulation_running = False
-    st.session_state.sim_time = 0
-    st.session_state.cars = initialize_cars()
-    st.session_state.accident_info = None
-    st.session_state.alert_log = []
-    st.rerun() 
+    reset_simulation()
+    st.rerun()
 
 # -----------------------
 # MAIN SIMULATION RENDER
 # -----------------------
-if st.session_state.simulation_running:
-    
-    # --- Placeholders for UI elements ---
-    st.markdown(f"**Road `A` (Start) to `G` (End)** | **Blackspot at `B`** | **Fog Visibility:** `{VISIBILITY_DISTANCE:.1f} units` (Indicated by `|`)")
-    
+
+def build_dashboard():
+    """Lays out the static dashboard chrome and placeholders. This runs once
+    per full script run; the tick fragment only pushes updates into the
+    placeholders instead of re-creating the layout every frame."""
+    global road_slot, status_slot
+    params = st.session_state.params
+
+    st.markdown(f"**Road `A` (Start) to `G` (End)** | **Blackspot at `B`** | **Fog Visibility:** `{params.visibility:.1f} units` (Indicated by `|`)")
+
     # --- SINGLE ROAD DISPLAY ---
     st.subheader("Full Road View")
-    road_placeholder = st.empty()
-    
+    road_slot = st.empty()
+
     # --- CAR STATUS ---
     st.markdown("---")
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        car1_status = st.empty()
-    with col2:
-        car2_status = st.empty()
-    with col3:
-        car3_status = st.empty()
-    with col4:
-        car4_status = st.empty()
-        
-    # This placeholder is the fix for the DeltaGenerator error
-    voice_placeholder = st.empty()
-    
-    # --- 1. Clear voice queue ---
-    st.session_state.voice_queue = []
-
-    # --- 2. Update logic ---
-    st.session_state.accident_info = update_simulation_logic(
-        st.session_state.cars, 
-        st.session_state.sim_time, 
-        st.session_state.accident_info, 
-        st.session_state.alert_log, 
-        st.session_state.voice_queue
-    )
-
-    # --- 3. Render the simulation ---
-    road_placeholder.code(render_full_road(st.session_state.cars), language="text")
-
-    # --- 4. Render Status Metrics ---
-    car1_status.metric("Car 1", st.session_state.cars['1']['status'], f"{int(st.session_state.cars['1']['x'])}m")
-    car2_status.metric("Car 2", st.session_state.cars['2']['status'], f"{int(st.session_state.cars['2']['x'])}m")
-    
-    # Highlight the "saved" cars
-    if st.session_state.cars['3']['status'] == 'Braking (Alert)':
-        car3_status.metric("Car 3", st.session_state.cars['3']['status'], "ATOA ALERT!")
-    else:
-        car3_status.metric("Car 3", st.session_state.cars['3']['status'], f"{int(st.session_state.cars['3']['x'])}m")
-    
-    if st.session_state.cars['4']['status'] == 'Braking (Alert)':
-        car4_status.metric("Car 4", st.session_state.cars['4']['status'], "ATOA ALERT!")
-    else:
-        car4_status.metric("Car 4", st.session_state.cars['4']['status'], f"{int(st.session_state.cars['4']['x'])}m")
-
-
-    # --- 5. Process Voice Alerts (Hidden) ---
-    voice_html = speak_alerts(st.session_state.voice_queue)
-    voice_placeholder.empty() 
-    voice_placeholder.write(components.html(voice_html, height=0))
+    status_slot = st.empty()
+    # Fresh placeholders need a full repaint on the first push.
+    st.session_state.prev_status_table = None
+    st.session_state.prev_road_key = None
+
+def push_dashboard():
+    """Writes the road view and the car status table into the slots,
+    skipping whichever of them is unchanged since the last push."""
+    state = st.session_state
+    cars = state.cars
+    status = cars['status']
+
+    # Fingerprint on what is actually drawn (display cell + status): at
+    # braking speed the position advances every tick but the cell only
+    # every other one, so matching keys skip the render build entirely.
+    road_key = ((cars['x'] // SCALE).tobytes(), status.tobytes())
+    if road_key != state.prev_road_key:
+        road_slot.code(render_full_road(cars, state.params.visibility), language="text")
+        state.prev_road_key = road_key
+
+    # One markdown table is a single element update per tick; four st.metric
+    # widgets in four columns were 2N protobuf deltas each frame.
+    x_int = cars['x'] // SCALE # all display positions in one pass
+    rows = []
+    for i in range(NUM_CARS):
+        # Highlight the "saved" cars
+        if i >= 2 and status[i] == BRAKING_ALERT:
+            position = "🚨 ATOA ALERT!"
+        else:
+            position = f"{x_int[i]}m"
+        rows.append(f"| Car {CAR_IDS[i]} | {STATUS_DOT[status[i]]} {STATUS_LABEL[status[i]]} | {position} |\n")
+    table = "| Car | Status | Position |\n|---|---|---|\n" + "".join(rows)
+    if table != state.prev_status_table:
+        status_slot.markdown(table)
+        state.prev_status_table = table
+
+
+TICK_SECONDS = 0.3 # Simulation-logic step length
+
+@st.fragment(run_every=TICK_SECONDS * st.session_state.get('ticks_per_frame', 1)
+             if st.session_state.simulation_running else None)
+def simulation_tick():
+    """One simulation frame. Only this fragment reruns per frame, so the
+    sidebar, page config and titles are not re-executed. A frame advances
+    the logic by ticks_per_frame steps but renders only the final state."""
+    # Bind the hot state to locals once: every st.session_state read is a
+    # proxy __getattr__ plus a dict lookup, and the tick does many of them.
+    state = st.session_state
+    if not state.simulation_running:
+        return
+    cars = state.cars
+    status = cars['status']
+
+    # --- 1. Clear voice queue (it accumulates across the mini-batch) ---
+    state.voice_queue = voice_queue = []
+
+    # --- 2. Update logic, possibly several steps per frame ---
+    for _ in range(state.ticks_per_frame):
+        state.accident_info = update_simulation_logic(
+            cars, state.sim_time, state.accident_info, state.alert_log, voice_queue
+        )
+        state.sim_time += 1
+        if np.all(status >= STOPPED):
+            break
+
+    # --- 3. Render the simulation (final state only) ---
+    push_dashboard()
+
+    # --- 4. Process Voice Alerts (Hidden) ---
+    # Skipped entirely on quiet ticks: an empty queue used to still cost
+    # an iframe injection every frame.
+    if voice_queue:
+        _get_components().html(speak_alerts(voice_queue), height=0)
+
+    # Check for end condition (terminal states all sort >= STOPPED)
+    if np.all(status >= STOPPED):
+        state.simulation_running = False
+        state.demo_finished = True
+        state.celebrate = True
+        st.rerun(scope="app") # Full rerun drops the fragment's timer
 
-    # --- 6. Increment time and rerun ---
-    st.session_state.sim_time += 1
 
-    # Check for end condition
-    if all(c['status'] in ['Finished', 'Stopped', 'Crashed'] for c in st.session_state.cars.values()):
-        st.session_state.simulation_running = False
-        st.success("Simulation Demo Finished.")
-        if st.session_state.cars['3']['status'] == 'Stopped' and st.session_state.cars['4']['status'] == 'Stopped':
-             st.success("Proof of Concept: Cars 3 and 4 received the ATOA alert and stopped safely!")
+if st.session_state.simulation_running:
+    build_dashboard()
+    simulation_tick()
+elif st.session_state.demo_finished:
+    build_dashboard()
+    push_dashboard()
+    st.success("Simulation Demo Finished.")
+    if st.session_state.cars['status'][2] == STOPPED and st.session_state.cars['status'][3] == STOPPED:
+        st.success("Proof of Concept: Cars 3 and 4 received the ATOA alert and stopped safely!")
+    if st.session_state.pop('celebrate', False):
         st.balloons()
-    else:
-        time.sleep(0.3) # Control the simulation speed
-        st.rerun()
-
 else:
     st.info("Press 'Start Simulation' in the sidebar to begin.")